@@ -90,7 +90,7 @@ class ScrollBlock(Block):
         direction -- two-length list with x and y offset: by how much "screen" the camera must be moved
         e.g. [0, 1] to move by one screen down
         """
-        super(ScrollBlock, self).__init__(next(self._idcounter), pos, rsize)
+        super(ScrollBlock, self).__init__(self.nextid(), pos, rsize)
         self.image.fill((100, 200, 50))
         self.image.set_colorkey((0, 0, 0))
         self.direction = direction
@@ -339,7 +339,7 @@ class NewBlockDialog(tk.Toplevel):
         if value:
             blocktype = self.blocktypes.get()
             if blocktype in self.allblocks:
-                nid = next(getattr(src.mzgblocks, blocktype)._idcounter)
+                nid = getattr(src.mzgblocks, blocktype).nextid()
                 idepos = editorarea.pixtopos(self.cpp[0], self.cpp[1], *editorarea.corrpix_comp(self.blockpos))
                 attributes = {"blockid":str(nid), "x":str(idepos[0]), "y":str(idepos[1])}
                 if self.custompanel is not None:
@@ -352,7 +352,7 @@ class NewBlockDialog(tk.Toplevel):
                 pygame.event.post(newev)
             elif blocktype == 'Door Set':
                 bltp = ['Door', 'Door', 'Key']
-                nids = [next(src.mzgblocks.Door._idcounter), next(src.mzgblocks.Door._idcounter), next(src.mzgblocks.Key._idcounter)]
+                nids = [src.mzgblocks.Door.nextid(), src.mzgblocks.Door.nextid(), src.mzgblocks.Key.nextid()]
                 params = [{"blockid":str(nids[0]), "x":str(self.blockpos[0]), "y":str(self.blockpos[1]),
                                 "destination":str(nids[1]), "locked":"true"},
                           {"blockid":str(nids[1]), "x":str(self.blockpos[0]+50), "y":str(self.blockpos[1]),
@@ -736,8 +736,8 @@ class App(tk.Tk):
                 elif event.type == pyloc.MOUSEMOTION and self.maze is not None:
                     if event.buttons == (1, 0, 0) and self.grabbed is not None:
                         if pygame.key.get_pressed()[pyloc.K_LCTRL] and self.grabbed.resizable:
-                            nw = self.grabbed.rsize[0] + event.rel[0]
-                            nh = self.grabbed.rsize[1] + event.rel[1]
+                            nw = self.grabbed.aurect.width + event.rel[0]
+                            nh = self.grabbed.aurect.height + event.rel[1]
                             self.pygscreen.fill(self.maze.BGCOL, editorarea.corrpix_blit(self.grabbed.rect))
                             self.grabbed.rsize = [nw, nh]
                             self.grabbed.update(self.maze.cpp[0], self.maze.cpp[1])
@@ -767,6 +767,7 @@ class App(tk.Tk):
 if __name__ == "__main__":
     pygame.init()
     screen = pygame.display.set_mode(src.PosManager.screen_size())
+    src.mzgblocks.init_assets()
     gui = App(screen)
     gui.geometry("500x500+10+10")
     gui.protocol("WM_DELETE_WINDOW", gui.on_closing)
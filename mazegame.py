@@ -39,12 +39,14 @@ import pygame.locals as pyloc
 
 import src.mzgmenu as mmenu
 from src import PosManager
+from src.mzgblocks import init_assets
 
 if __name__ == "__main__":
     #initializing stuffs
     pygame.init()
     screen = pygame.display.set_mode(PosManager.screen_size())
     pygame.display.set_caption("Mazegame")
+    init_assets()
     game = mmenu.TopLev(screen)
     game.gameloop()
 
@@ -152,6 +152,8 @@ class FlRect:
     centerx, centery: coordinates of the centre of the rectangle.
     width, height: self-explanatory. 
     """
+
+    __slots__ = ('_x', '_y', '_w', '_h')
     
     def __init__(self, x, y, w, h):
         """Initialization:
@@ -267,11 +269,21 @@ class FlRect:
             yy = off[1]
         return FlRect(self._x + xx, self._y + yy, self._w, self._h)
 
+    def move_ip(self, *off):
+        """Equivalent to the 'move_ip' method of pygame.Rect"""
+        if isinstance(off[0], (tuple, list, np.ndarray)):
+            xx = off[0][0]
+            yy = off[0][1]
+        else:
+            xx = off[0]
+            yy = off[1]
+        self._x += xx
+        self._y += yy
+
     def colliderect(self, other):
-        """Equivalent to the 'colliderect' method of pygame.Rect"""
-        boolx = (self.right - other.left) * (other.right - self.left) > 0
-        booly = (self.bottom - other.top) * (other.bottom - self.top) > 0
-        return boolx and booly
+        """Equivalent to the 'colliderect' method of pygame.Rect. Touching edges do not collide."""
+        return (self._x < other._x + other._w and other._x < self._x + self._w
+                and self._y < other._y + other._h and other._y < self._y + self._h)
 
     def contains(self, other):
         """Equivalent to the 'contains' method of pygame.Rect"""
@@ -299,3 +311,54 @@ class FlRect:
         bpos = np.array([other.centerx, other.centery])
         return apos - bpos
 
+
+class SpatialHash:
+    """Uniform grid indexing objects by the cells covered by their rectangle.
+
+    Objects must have an 'aurect' attribute (a FlRect) and must not move while stored.
+    add -- store an object in all the cells covered by its rect
+    remove -- remove an object previously added
+    query_rect -- return the objects stored in the cells covered by a rect, without duplicates.
+    Objects are only candidates, the caller still has to test the actual collision.
+    """
+
+    def __init__(self, cellsize):
+        """Initialization:
+
+        cellsize -- side of the square cells, in the same units of the rects
+        """
+        self.cellsize = cellsize
+        self._cells = {}
+
+    def _cellrange(self, rect):
+        """Generate the (ix, iy) keys of the cells covered by rect"""
+        cs = self.cellsize
+        x0 = int(rect.left // cs)
+        x1 = int(rect.right // cs)
+        y0 = int(rect.top // cs)
+        y1 = int(rect.bottom // cs)
+        for ix in range(x0, x1+1):
+            for iy in range(y0, y1+1):
+                yield ix, iy
+
+    def add(self, obj):
+        for key in self._cellrange(obj.aurect):
+            self._cells.setdefault(key, []).append(obj)
+
+    def remove(self, obj):
+        for key in self._cellrange(obj.aurect):
+            cell = self._cells.get(key)
+            if cell is not None and obj in cell:
+                cell.remove(obj)
+                if len(cell) == 0:
+                    del self._cells[key]
+
+    def query_rect(self, rect):
+        #dict keeps the insertion order and drops objects found in more than one cell
+        found = {}
+        cells = self._cells
+        for key in self._cellrange(rect):
+            cell = cells.get(key)
+            if cell is not None:
+                found.update(dict.fromkeys(cell))
+        return list(found)
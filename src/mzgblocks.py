@@ -52,8 +52,9 @@ Character -- The cursor controlled by the player.
 
 import os
 import math
-from itertools import count
 from operator import itemgetter
+from itertools import chain
+from functools import lru_cache
 
 import numpy as np
 from lxml import etree
@@ -67,13 +68,80 @@ from src.mzgscreen import mazearea, editorarea
 
 IMAGE_DIR = os.path.join(src.MAIN_DIR, '../images')
 
+#font used by Block.blitinfo, created on first use (pygame.font must be initialized)
+_INFO_FONT = None
+
+
+@lru_cache(maxsize=256)
+def _infotext(text):
+    """Return the rendered surface of a Block.blitinfo text, cached since the editor redraws the same ids"""
+    global _INFO_FONT
+    if _INFO_FONT is None:
+        _INFO_FONT = pygame.font.Font(None, 30)
+    return _INFO_FONT.render(text, True, (255, 0, 0))
+
 
 def add_counter(cls):
     """Decorator to add a counter to each class"""
-    cls._idcounter = count(0)
+    cls._idcounter = 0
     return cls
 
 
+class BlockGroup(sprite.Group):
+    """A pygame.sprite.Group of static blocks, which can be searched through a spatial hash.
+
+    Used for the walls, the ladders and the deadly blocks of a room, which do not move during the game.
+    The hash is built at the first query and discarded whenever blocks are added or removed.
+    Small groups are scanned directly against a cached list of the block edges,
+    the hash does not pay off for them.
+    """
+
+    #groups smaller than this are scanned without the hash
+    MINHASHED = 32
+    #minimum side of the hash cells, in arbitrary units
+    MINCELL = 32
+
+    def __init__(self, *sprites):
+        self._shash = None
+        self._edges = None
+        super(BlockGroup, self).__init__(*sprites)
+
+    def add_internal(self, spr, layer=None):
+        super(BlockGroup, self).add_internal(spr, layer)
+        self._shash = None
+        self._edges = None
+
+    def remove_internal(self, spr):
+        super(BlockGroup, self).remove_internal(spr)
+        self._shash = None
+        self._edges = None
+
+    def buildedges(self):
+        """Store a (block, left, top, right, bottom) tuple for each block of the group"""
+        self._edges = [(bl, bl.aurect.left, bl.aurect.top, bl.aurect.right, bl.aurect.bottom) for bl in self.sprites()]
+
+    def buildhash(self):
+        """Build the spatial hash, the cell side is twice the average block side"""
+        blocks = self.sprites()
+        avgside = sum(bl.aurect.width + bl.aurect.height for bl in blocks) / (2 * max(1, len(blocks)))
+        self._shash = src.SpatialHash(max(self.MINCELL, 2 * avgside))
+        for bl in blocks:
+            self._shash.add(bl)
+
+    def colliding(self, aur):
+        """Return the blocks of the group colliding with aur, a FlRect"""
+        if len(self) < self.MINHASHED:
+            if self._edges is None:
+                self.buildedges()
+            ax, ay = aur.x, aur.y
+            ar, ab = ax + aur.width, ay + aur.height
+            #same strict comparisons of FlRect.colliderect, without a call per block
+            return [bl for bl, le, to, ri, bo in self._edges if le < ar and ax < ri and to < ab and ay < bo]
+        if self._shash is None:
+            self.buildhash()
+        return [bl for bl in self._shash.query_rect(aur) if aur.colliderect(bl.aurect)]
+
+
 class Block(sprite.Sprite, src.PosManager):
     '''Common interface for all sprite block types.
 
@@ -83,10 +151,13 @@ class Block(sprite.Sprite, src.PosManager):
     reprxml -- return text line of the block in map file format (used to create a map by the editor)
     reprxmlnew -- classmethod, used by editor to write lines of new blocks to be saved in the map file
     collidinggroup -- return other sprites of a group colliding with this sprite
-    It has also the following property:
+    It has also the following properties:
     risze -- get or set the size of the block, if resizable
+    bg -- get or set the background, a color or a tile (None for no background)
     '''
 
+    __slots__ = ('_id', 'image', 'aurect', '_bg', '_fillbg', 'rect')
+
     resizable = True
     actionmenu = {"Delete" : "delete", "Move to another room" : "move"}
     if src.ISGAME:
@@ -113,9 +184,9 @@ class Block(sprite.Sprite, src.PosManager):
         self.update(0, 0)
 
     @classmethod
-    def recttopix(cls, rr, xoff=0, yoff=0):
+    def recttopix(cls, rr, xoff=0, yoff=0, out=None):
         """Classmethod to use the correct recttopix method"""
-        return cls.area.recttopix(rr, xoff, yoff)
+        return cls.area.recttopix(rr, xoff, yoff, out)
 
 
     @classmethod
@@ -124,23 +195,45 @@ class Block(sprite.Sprite, src.PosManager):
         return cls.area.sizetopix(rr)
 
 
-    def fillimage(self):
-        """Fill the image with the bg color or mosaic tile.
+    @property
+    def bg(self):
+        return self._bg
 
-        Return nothing, raise a RuntimeError if an invalid instance has been
-        stored as the 'bg' argument.
+    @bg.setter
+    def bg(self, value):
+        """Store the background and select the fill method matching its type.
+
+        Raise a RuntimeError if value is not None, a color or a pygame.Surface.
         """
-        if self.bg is None:
-            pass
-        elif isinstance(self.bg, (tuple, list)):
-            self.image.fill(self.bg)
-        elif isinstance(self.bg, pygame.Surface):
-            subim = self.bg.convert()
-            for i in range(0, self.rsize[0], subim.get_rect().width):
-                for j in range(0, self.rsize[1], subim.get_rect().height):
-                    self.image.blit(subim, (i, j))
+        if value is None:
+            self._fillbg = Block._fillnone
+        elif isinstance(value, (tuple, list)):
+            self._fillbg = Block._fillcolor
+        elif isinstance(value, pygame.Surface):
+            self._fillbg = Block._filltile
         else:
             raise RuntimeError("Wrong initialization parameter.")
+        self._bg = value
+
+    def _fillnone(self):
+        pass
+
+    def _fillcolor(self):
+        self.image.fill(self._bg)
+
+    def _filltile(self):
+        #tiling the whole image with a single batch blit
+        subim = self._bg
+        tw, th = subim.get_size()
+        iw, ih = self.image.get_size()
+        self.image.blits([(subim, (i, j)) for i in range(0, iw, tw) for j in range(0, ih, th)], False)
+
+    def fillimage(self):
+        """Fill the image with the bg color or mosaic tile.
+
+        The fill method is chosen once when bg is set, so no type check is done here.
+        """
+        self._fillbg(self)
 
     #prepare drawing, shift blocks to be in the screen
     def update(self, xoff, yoff):
@@ -159,7 +252,8 @@ class Block(sprite.Sprite, src.PosManager):
                 return
             self.aurect.width = newsize[0]
             self.aurect.height = newsize[1]
-            self.image = pygame.transform.scale(self.image, nwpxsize)
+            #fillimage repaints the whole surface, no need to scale the old content
+            self.image = pygame.Surface(nwpxsize)
             self.fillimage()
 
     def reprxml(self):
@@ -196,20 +290,36 @@ class Block(sprite.Sprite, src.PosManager):
 
         return res
 
-    def collidinggroup(self, group):
-        """Return other sprites of a group colliding with this sprite"""
-        return [sp for sp in group.sprites() if self.aurect.colliderect(sp.aurect)]
+    def collidinggroup(self, group, rect=None):
+        """Return other sprites of a group colliding with this sprite
+
+        rect -- if given, a FlRect tested in place of the 'aurect' of this sprite
+        """
+        aur = self.aurect if rect is None else rect
+        if isinstance(group, BlockGroup):
+            return group.colliding(aur)
+        return [spr for spr in group.sprites() if aur.colliderect(spr.aurect)]
 
     @classmethod
     def initcounter(cls):
         """Classmethod to reset the id generator"""
-        cls._idcounter = count(0)
+        cls._idcounter = 0
+
+    @classmethod
+    def nextid(cls):
+        """Classmethod to get a new id from the generator"""
+        cls._idcounter += 1
+        return cls._idcounter - 1
+
+    @classmethod
+    def allocate_ids(cls, n):
+        """Classmethod to reserve n consecutive new ids at once, returned as a range"""
+        start = cls._idcounter
+        cls._idcounter += n
+        return range(start, start + n)
 
     def blitinfo(self, *args):
-        text = '.'.join(map(str, args))
-        mfont = pygame.font.Font(None, 30)
-        surftext = mfont.render(text, True, (255, 0, 0))
-        self.image.blit(surftext, (0, 0))
+        self.image.blit(_infotext('.'.join(map(str, args))), (0, 0))
 
 
 @add_counter
@@ -219,6 +329,8 @@ class Marker(Block):
     Children of Block. Markers have an id incremented by 1 each time a new Marker
     is created, but can be resetted by the initcounter method.
     """
+
+    __slots__ = ('ref',)
     
     resizable = False
     label = 'M'
@@ -255,6 +367,8 @@ class Wall(Block):
 
     Children of Block.
     """
+
+    __slots__ = ()
     
     label = 'W'
     BGCOL = (255, 255, 255)
@@ -282,6 +396,8 @@ class Ladder(Block):
 
     Children of Block.
     """
+
+    __slots__ = ()
     
     label = 'L'
     BGIMAGE = pygame.image.load(os.path.join(IMAGE_DIR, "ladderpattern.png"))
@@ -310,6 +426,8 @@ class DeadlyBlock(Block):
     Children of Block. Create a death event if the player collides with it.
     """
 
+    __slots__ = ()
+
     label = 'T'
     BGCOL = (0, 0, 255)
 
@@ -347,6 +465,8 @@ class Door(Block):
     Door is also used for the exit of the maze (winning the game). It works the same,
     but the icon is gold instead of white. Exit do not have a corresponding door.
     """
+
+    __slots__ = ('destination', '_locked')
     
     resizable = False
     rectsize = [50, 50]
@@ -384,6 +504,9 @@ class Door(Block):
 
     @locked.setter
     def locked(self, boolvalue):
+        #icon is redrawn only on status change (or first assignment)
+        if getattr(self, '_locked', None) == boolvalue:
+            return
         self._locked = boolvalue
         self.showicon()
 
@@ -391,14 +514,14 @@ class Door(Block):
         """Show / switch the icon door locked / door open"""
         if self.destination >= 0:
             if self.locked:
-                self.image.blit(self.LOCKEDDOOR.convert(), [0, 0])
+                self.image.blit(self.LOCKEDDOOR, [0, 0])
             else:
-                self.image.blit(self.OPENDOOR.convert(), [0, 0])
+                self.image.blit(self.OPENDOOR, [0, 0])
         else:
             if self.locked:
-                self.image.blit(self.LOCKEDEXIT.convert(), [0, 0])
+                self.image.blit(self.LOCKEDEXIT, [0, 0])
             else:
-                self.image.blit(self.OPENEXIT.convert(), [0, 0])
+                self.image.blit(self.OPENEXIT, [0, 0])
         
     def entering_event(self):
         """Post an enterdoorevent into the pygame.event queue"""
@@ -426,6 +549,8 @@ class Key(Block):
     A Key can be set to open the exit Door, too.
     Key have a property 'taken' to get / set if the key has been taken.
     """
+
+    __slots__ = ('whoopen', '_taken')
     
     resizable = False
     rectsize = [50, 50]
@@ -456,6 +581,9 @@ class Key(Block):
 
     @taken.setter
     def taken(self, boolvalue):
+        #icon is redrawn only on status change (or first assignment)
+        if getattr(self, '_taken', None) == boolvalue:
+            return
         self._taken = boolvalue
         self.showicon()
 
@@ -464,7 +592,7 @@ class Key(Block):
         if self.taken:
             self.image.fill((0, 0, 0))
         else:
-            self.image.blit(self.IMKEY.convert(), [0, 0])
+            self.image.blit(self.IMKEY, [0, 0])
     
     def takingkey_event(self):
         """Post a takekeyevent into the pygame.event queue"""
@@ -488,6 +616,8 @@ class EnemyBot(Block):
     If the player touches them, it's game over.
     """
 
+    __slots__ = ('pathmarkers', '_mpos', '_segs', 'off', 'curspeed', 'nextrect', '_ipm', '_ux', '_uy')
+
     resizable = False
     rectsize = [30, 30]
     label = 'B'
@@ -506,8 +636,12 @@ class EnemyBot(Block):
         """
         super(EnemyBot, self).__init__(bid, pos, self.rectsize, self.BGCOL)
         Marker.initcounter()
-        coordpoints = [crd for crd in src.pairextractor(*coordlist)] + [pos]
-        self.pathmarkers = sprite.Group([Marker(next(Marker._idcounter), cppos, self.rectsize, self._id) for cppos in coordpoints]) #id of markers
+        #flat coordinates to [x, y] pairs, as plain Python numbers of a single common type
+        #(all ints for the map coordinates, all floats if any coordinate is a float)
+        coordpoints = chain(np.reshape(coordlist, (-1, 2)).tolist(), [pos])
+        #ordered list of the markers, the last one is the starting position
+        self.pathmarkers = [Marker(Marker.nextid(), cppos, self.rectsize, self._id) for cppos in coordpoints] #id of markers
+        self.setmarkerpos()
         self.setspeed()
         self.fillimage()
         
@@ -530,30 +664,42 @@ class EnemyBot(Block):
         res = super(EnemyBot, cls).reprxmlnew(**fund_kwargs)
         mrkx = int(kwargs["x"])
         mrky = kwargs["y"]
-        for i in range(1, kwargs["nummarker"]+1):
-            mrid = next(Marker._idcounter)
+        for i, mrid in enumerate(Marker.allocate_ids(kwargs["nummarker"]), 1):
             mrkattr = {"blockid":str(mrid), "x":str(mrkx + i*50), "y":mrky}
             res.append(Marker.reprxmlnew(**mrkattr))
         return res
 
     def getmarkers(self):
         """Return all the Markers but the one equal to enemy initial position"""
-        return self.pathmarkers.sprites()[:-1]
+        return self.pathmarkers[:-1]
+
+    def setmarkerpos(self):
+        """Store the marker positions in a (N, 2) numpy array, in the same order of pathmarkers,
+        and precompute the unit vector of each segment of the path.
+
+        Row i of the segment table is the unit vector from marker i-1 to marker i
+        (row 0 starts from the last marker, the starting position). Zero-length segments
+        get a null vector.
+        """
+        self._mpos = np.array([[mrk.aurect.x, mrk.aurect.y] for mrk in self.pathmarkers], dtype=float)
+        deltas = self._mpos - np.roll(self._mpos, 1, axis=0)
+        seglen = np.hypot(deltas[:, 0], deltas[:, 1])[:, np.newaxis]
+        units = np.divide(deltas, seglen, out=np.zeros_like(deltas), where=seglen > 0)
+        self._segs = [tuple(row) for row in units.tolist()]
 
     def addmarker(self, x, y):
-        """Add a marker to pathmakers group, used by editor."""
-        last = self.pathmarkers.sprites()[-1]
-        self.pathmarkers.remove(last)
-        self.pathmarkers.add(Marker(last._id, [x, y], self.rectsize, self._id, False))
+        """Add a marker to pathmakers list, used by editor."""
+        last = self.pathmarkers[-1]
+        self.pathmarkers.insert(-1, Marker(last._id, [x, y], self.rectsize, self._id))
         last._id += 1
-        self.pathmarkers.add(last)
+        self.setmarkerpos()
         
     def update(self, xoff, yoff):
         """Override method of base class to store also current offset and update the Markers rects"""
         self.off = [xoff, yoff]
         super(EnemyBot, self).update(xoff, yoff)
         try:
-            for mrk in self.pathmarkers.sprites():
+            for mrk in self.pathmarkers:
                 mrk.update(xoff, yoff)
         except AttributeError:
             pass
@@ -566,32 +712,30 @@ class EnemyBot(Block):
     def setspeed(self):
         """Set the x and y component of the velocity pointing to the next marker"""
         try:
-            curmarkerrect = self.pathmarkers.sprites()[self._ipm].aurect
-            self._ipm += 1
+            self._ipm = (self._ipm + 1) % len(self.pathmarkers)
         except AttributeError:
-            curmarkerrect = self.pathmarkers.sprites()[-1].aurect
-            self._ipm = 0
-            
-        if self._ipm == len(self.pathmarkers.sprites()):
             self._ipm = 0
 
-        self.nextrect = self.pathmarkers.sprites()[self._ipm].aurect
-        
-        vecdist = self.nextrect.distance(curmarkerrect)
-        angle = np.arctan2(vecdist[1], vecdist[0])
-        self.curspeed = np.array([self.speed*np.cos(angle), self.speed*np.sin(angle)])
+        self.nextrect = self.pathmarkers[self._ipm].aurect
+        #unit vector of the segment, constant until the next marker is reached
+        self._ux, self._uy = self._segs[self._ipm]
+        self.curspeed = (self.speed*self._ux, self.speed*self._uy)
 
     def movebot(self):
         """Move the bot by one frame time unit according to its velocity"""
-        cvdist = self.nextrect.distance(self.aurect)
-        moddist = np.linalg.norm(cvdist)
-        if moddist >= (self.speed * src.TPF):
-            self.aurect.x += self.curspeed[0] * src.TPF
-            self.aurect.y += self.curspeed[1] * src.TPF
-            self.rect = self.recttopix(self.aurect, self.off[0], self.off[1])
+        tpf = src.TPF
+        aur = self.aurect
+        nxt = self.nextrect
+        moddist = math.hypot(nxt.x - aur.x, nxt.y - aur.y)
+        if moddist >= (self.speed * tpf):
+            cvx, cvy = self.curspeed
+            aur.x += cvx * tpf
+            aur.y += cvy * tpf
+            self.recttopix(aur, self.off[0], self.off[1], self.rect)
         else:
-            self.aurect.x = self.pathmarkers.sprites()[self._ipm].aurect.x
-            self.aurect.y = self.pathmarkers.sprites()[self._ipm].aurect.y
+            #nextrect is the rect of the marker reached
+            aur.x = nxt.x
+            aur.y = nxt.y
             self.setspeed()
 
 
@@ -603,6 +747,8 @@ class WindArea(Block):
     may have different intensities.
     """
 
+    __slots__ = ('_windpar', 'wind', '_visible')
+
     label = 'F'
     WINDUP = pygame.image.load(os.path.join(IMAGE_DIR, "windarrow.png"))
     WINDUPRI = pygame.image.load(os.path.join(IMAGE_DIR, "windarrowdiag.png"))
@@ -612,9 +758,12 @@ class WindArea(Block):
     WINDUPLE = pygame.transform.rotate(WINDUPRI, 90)
     WINDDOLE = pygame.transform.rotate(WINDUPRI, 180)
     WINDDORI = pygame.transform.rotate(WINDUPRI, 270)
-    _winddict = {0 : [np.array([0.0, -1.0]), WINDUP], 1 : [np.array([1.0, -1.0]), WINDUPRI], 2 : [np.array([1.0, 0.0]), WINDRI],
-                3 : [np.array([1.0, 1.0]), WINDDORI], 4 : [np.array([0.0, 1.0]), WINDDO], 5 : [np.array([-1.0, 1.0]), WINDDOLE],
-                6 : [np.array([-1.0, 0.0]), WINDLE], 7 : [np.array([-1.0, -1.0]), WINDUPLE]}
+    #unit vectors and images of the wind directions, indexed by compass direction (0 is up, clockwise).
+    #Diagonals are normalized too
+    _invsqrt2 = math.sqrt(0.5)
+    _windvecs = ((0.0, -1.0), (_invsqrt2, -_invsqrt2), (1.0, 0.0), (_invsqrt2, _invsqrt2),
+                 (0.0, 1.0), (-_invsqrt2, _invsqrt2), (-1.0, 0.0), (-_invsqrt2, -_invsqrt2))
+    _windsurfs = [WINDUP, WINDUPRI, WINDRI, WINDDORI, WINDDO, WINDDOLE, WINDLE, WINDUPLE]
     _forcefactor = 100.0
     cursorinside = None
 
@@ -632,16 +781,17 @@ class WindArea(Block):
         vis -- boolean, in False windarea is invisible"""
         super(WindArea, self).__init__(bid, pos, rsize)
         self._windpar = windpar
-        try:
-            self.wind = self._winddict[self._windpar[0]][0] * self._windpar[1] * self._forcefactor
-        except KeyError as e:
-            raise Exception('Error in instantiating WindArea, direction should be an integer between 0 and 7') from e
+        if not 0 <= self._windpar[0] < len(self._windvecs):
+            raise Exception('Error in instantiating WindArea, direction should be an integer between 0 and 7')
+        wdx, wdy = self._windvecs[self._windpar[0]]
+        wforce = self._windpar[1] * self._forcefactor
+        self.wind = (wdx * wforce, wdy * wforce)
         self.visible = vis
 
     def fillimage(self):
         """Override"""
         if self._visible:
-            self.bg = self._winddict[self._windpar[0]][1]
+            self.bg = self._windsurfs[self._windpar[0]]
             super(WindArea, self).fillimage()
         else:
             self.bg = None
@@ -666,7 +816,7 @@ class WindArea(Block):
 
     def exiting_wind_event(self):
         """Post the exiting wind event to the pygame.event system"""
-        newev = pygame.event.Event(src.EXITINGEVENT, wind=np.array([0, 0]))
+        newev = pygame.event.Event(src.EXITINGEVENT, wind=(0.0, 0.0))
         pygame.event.post(newev)
 
     def reprxml(self):
@@ -688,6 +838,8 @@ class Checkpoint(Block):
     Children of block.
     """
 
+    __slots__ = ()
+
     resizable = False
     rectsize = [50, 50]
     label = 'C'
@@ -712,15 +864,18 @@ class Character(Block):
     Is affected by gravity, can move left, right and jump at fixed speed. Can climb ladders.
     There should be only one character in the maze.
     """
+
+    __slots__ = ('current_direction', 'cridx', 'touchplane', 'off', '_pixkey', '_reststate', 'speed', 'jumpspeed', 'dvx', 'dvy', 'ax', 'ay', '_dvystep')
     
     resizable = False
     rectsize = [20, 20]
     CURSORCOL = (255, 0, 0)
-    UP = 0
-    DOWN = 1
-    LEFT = 2
-    RIGHT = 3
-    JUMP = 4
+    #direction flags, combined in the current_direction bitmask
+    UP = 1
+    DOWN = 2
+    LEFT = 4
+    RIGHT = 8
+    JUMP = 16
     
     def __init__(self, pos, iniroom):
         """Initialization:
@@ -729,9 +884,11 @@ class Character(Block):
         iniroom -- id of initial room
         """
         super(Character, self).__init__(0, pos, self.rectsize, self.CURSORCOL)
-        self.current_direction = set()
+        self.current_direction = 0
         self.cridx = iniroom
         self.touchplane = False
+        #state at the end of the last frame, if that frame left it unchanged (see movecharacter)
+        self._reststate = None
 
         #space unit is arbitrary (screen size = 1000), time unit is second
         #velocity value (on user movement)
@@ -743,6 +900,8 @@ class Character(Block):
         #acceleration
         self.ax = 0
         self.ay = 0
+        #y velocity increment in one frame, constant for a given force field
+        self._dvystep = 0
 
     def reprxml(self):
         """Override method of base class, adding extra attributes"""
@@ -757,7 +916,9 @@ class Character(Block):
 
     def update(self, xoff, yoff):
         """Override method of base class to store also current offset"""
-        self.off = np.array([xoff, yoff])
+        self.off = (xoff, yoff)
+        #offset and position of the last pixel rect computed by movecharacter
+        self._pixkey = None
         super(Character, self).update(xoff, yoff)
             
     def insidearea(self):
@@ -766,54 +927,46 @@ class Character(Block):
         Returns None if is inside, otherwise returns the corresponding
         offset in order to draw the next part of the room.
         """
-        coff = self.off * 1000
-        cnt = src.FlRect(coff[0], coff[1], coff[0]+1000, coff[1]+1000)
-        if cnt.contains(self.aurect):
+        coffx = self.off[0] * 1000
+        coffy = self.off[1] * 1000
+        cnt = src.FlRect(coffx, coffy, coffx+1000, coffy+1000)
+        aur = self.aurect
+        if cnt.contains(aur):
             return None
-        else:
-            if self.aurect.centery < cnt.top:
-                return np.array([0, -1])
-            elif self.aurect.centerx < cnt.left:
-                return np.array([-1, 0])
-            elif self.aurect.centery > cnt.bottom:
-                return np.array([0, 1])
-            elif self.aurect.centerx > cnt.right:
-                return np.array([1, 0])
+        #the character is outside, the centre tells on which side
+        cx = aur.centerx
+        cy = aur.centery
+        if cy < coffy:
+            return (0, -1)
+        elif cx < coffx:
+            return (-1, 0)
+        elif cy > cnt.bottom:
+            return (0, 1)
+        elif cx > cnt.right:
+            return (1, 0)
       
     def getdirmove(self):
         """Check key pressed to set the motion direction"""
-        pressed = pygame.key.get_pressed()
-        if pressed[pyloc.K_UP]:
-            self.current_direction.add(Character.UP)
-        if pressed[pyloc.K_DOWN]:
-            self.current_direction.add(Character.DOWN)
-        if pressed[pyloc.K_RIGHT]:
-            self.current_direction.add(Character.RIGHT)
-        if pressed[pyloc.K_LEFT]:
-            self.current_direction.add(Character.LEFT)
-        if pressed[pyloc.K_SPACE]:
-            if not self.touchplane:
-                self.current_direction.add(Character.JUMP)
-
-    def setforcefield(self, x, y=None):
+        p = pygame.key.get_pressed()
+        self.current_direction |= (p[pyloc.K_UP] * Character.UP
+                                   | p[pyloc.K_DOWN] * Character.DOWN
+                                   | p[pyloc.K_LEFT] * Character.LEFT
+                                   | p[pyloc.K_RIGHT] * Character.RIGHT
+                                   | (p[pyloc.K_SPACE] and not self.touchplane) * Character.JUMP)
+
+    def setforcefield(self, x, y):
         """Set the force field. It's possible to set something different from just gravity.
 
-        x, y are the acceleration components. If y is None, x must be a list holding both components.
+        x, y are the acceleration components (plain numbers).
         """
-        if y is None:
-            if isinstance(x, (tuple, list, np.ndarray)):
-                self.ax = x[0]
-                self.ay = x[1]
-            else:
-                raise RuntimeError("Wrong initialization parameter.")
-        else:
-            self.ax = x
-            self.ay = y
+        self.ax = x
+        self.ay = y
+        self._dvystep = self.ay * src.TPF
 
     def applyforce(self):
         """Apply the force field to get the velocity increment"""
         self.dvx += (self.ax - 0.5*self.dvx) * src.TPF
-        self.dvy += self.ay * src.TPF
+        self.dvy += self._dvystep
 
     def movecharacter(self, groupwalls, groupladders):
         """Move the character in the room
@@ -822,8 +975,19 @@ class Character(Block):
         groupladders -- a pygame.sprite.Group containing the Ladder sprites.
         These two groups are used to check for collision and adjust the
         velocity. Then the block is moved by one frame time unit.
+        If the last frame had no input and left the character where it was
+        (e.g. standing on a floor), this one would do the same: it is skipped.
         """
-        dsp = np.zeros(2)
+        self.getdirmove()
+        cdir = self.current_direction
+        startstate = (groupwalls, self.aurect.x, self.aurect.y, self.dvx, self.dvy, self.ax, self.ay, self.touchplane)
+        if cdir == 0 and startstate == self._reststate:
+            return
+
+        tpf = src.TPF
+        #displacement due to walking or climbing in one frame
+        step = self.speed * tpf
+        dsx = 0.0
         #applying force only if not on a ladder
         ladderspr = self.collidinggroup(groupladders)
         if len(ladderspr) == 0:
@@ -831,62 +995,96 @@ class Character(Block):
         else:
             self.dvx = 0
             self.dvy = 0
-            
-        self.getdirmove()
+
         #checking x movement
-        if len(self.current_direction) > 0:
-            if self.LEFT in self.current_direction:
-                dsp[0] += -1 * self.speed * src.TPF
-            if self.RIGHT in self.current_direction:
-                dsp[0] += self.speed * src.TPF
+        if cdir:
+            if cdir & self.LEFT:
+                dsx -= step
+            if cdir & self.RIGHT:
+                dsx += step
 
-        dsp[0] += self.dvx * src.TPF
-        self.aurect = self.aurect.move((dsp[0], 0))
+        dsx += self.dvx * tpf
+        self.aurect.move_ip(dsx, 0)
 
         #checking x collisions with walls
         collspr = self.collidinggroup(groupwalls)
         if len(collspr) > 0:
-            for w in collspr:
-                if self.aurect.left < w.aurect.right and dsp[0] < 0:
-                    self.aurect.left = w.aurect.right
-                elif self.aurect.right > w.aurect.left and dsp[0] > 0:
-                    self.aurect.right = w.aurect.left
-            if src.checksign(self.ax) == src.checksign(dsp[0]):
+            #every colliding wall overlaps the character, so pushing it back
+            #against the farthest wall edge resolves all of them
+            if dsx < 0:
+                self.aurect.left = max(w.aurect.right for w in collspr)
+            elif dsx > 0:
+                self.aurect.right = min(w.aurect.left for w in collspr)
+            #same sign check, (x > 0) - (x < 0) is the sign of x
+            if (self.ax > 0) - (self.ax < 0) == (dsx > 0) - (dsx < 0):
                 self.dvx = 0
 
-        #checking y movement, possible on ladders only
+        #checking y velocity: climbing is possible on ladders only, jumping everywhere
+        vy = self.dvy
         ladderspr = self.collidinggroup(groupladders)
         if len(ladderspr) > 0:
-            if self.touchplane:
-                self.touchplane = False
-            if len(self.current_direction) > 0:
-                if self.UP in self.current_direction:
-                    dsp[1] += -1 * self.speed * src.TPF
-                if self.DOWN in self.current_direction:
-                    dsp[1] += self.speed * src.TPF
-
-        #checking y movement due to jumping
-        if len(self.current_direction) > 0:
-            if self.JUMP in self.current_direction:
-                dsp[1] += -1 * self.jumpspeed * src.TPF
-
-        dsp[1] += self.dvy * src.TPF
-        self.aurect = self.aurect.move(0, dsp[1])
-        
-        #checking y collisions with walls
-        collspr = self.collidinggroup(groupwalls)
+            self.touchplane = False
+            if cdir & self.UP:
+                vy -= self.speed
+            if cdir & self.DOWN:
+                vy += self.speed
+        if cdir & self.JUMP:
+            vy -= self.jumpspeed
+        dsy = vy * tpf
+        oldtop = self.aurect.top
+        oldbottom = self.aurect.bottom
+        self.aurect.move_ip(0, dsy)
+
+        #checking y collisions with walls. The walls are searched in the whole strip swept
+        #during the frame (with some slack), so a fast fall cannot cross a thin wall.
+        #Then the walls overlapping the new position or crossed by the move are kept.
+        aur = self.aurect
+        swept = src.FlRect(aur.x, min(oldtop, aur.top) - 1, aur.width, aur.height + abs(dsy) + 2)
+        if dsy > 0:
+            collspr = [w for w in self.collidinggroup(groupwalls, swept)
+                       if w.aurect.top < aur.bottom and (w.aurect.bottom > aur.top or w.aurect.top >= oldbottom)]
+        elif dsy < 0:
+            collspr = [w for w in self.collidinggroup(groupwalls, swept)
+                       if w.aurect.bottom > aur.top and (w.aurect.top < aur.bottom or w.aurect.bottom <= oldtop)]
+        else:
+            collspr = self.collidinggroup(groupwalls)
         if len(collspr) > 0:
-            for w in collspr:
-                if self.aurect.top < w.aurect.bottom and dsp[1] < 0:
-                    self.aurect.top = w.aurect.bottom
-                elif self.aurect.bottom > w.aurect.top and dsp[1] > 0:
-                    self.aurect.bottom = w.aurect.top
-            if src.checksign(self.ay) == src.checksign(dsp[1]):
+            if dsy < 0:
+                self.aurect.top = max(w.aurect.bottom for w in collspr)
+            elif dsy > 0:
+                self.aurect.bottom = min(w.aurect.top for w in collspr)
+            if (self.ay > 0) - (self.ay < 0) == (dsy > 0) - (dsy < 0):
                 self.touchplane = False
             else:
                 self.touchplane = True
             self.dvx = 0
             self.dvy = 0
 
-        self.current_direction.clear()
-        self.rect = self.recttopix(self.aurect, self.off[0], self.off[1])
+        endstate = (groupwalls, self.aurect.x, self.aurect.y, self.dvx, self.dvy, self.ax, self.ay, self.touchplane)
+        self._reststate = endstate if cdir == 0 and endstate == startstate else None
+        self.current_direction = 0
+        #the pixel rect changes only if the character moved (it has a fixed size)
+        pixkey = (self.off[0], self.off[1], self.aurect.x, self.aurect.y)
+        if pixkey != self._pixkey:
+            self._pixkey = pixkey
+            self.recttopix(self.aurect, self.off[0], self.off[1], self.rect)
+
+
+def init_assets():
+    """Convert the class-level images of the blocks to the display pixel format.
+
+    To be called once, after the pygame display has been initialized. Blocks
+    blit these surfaces directly, without converting them each time.
+    """
+    Ladder.BGIMAGE = Ladder.BGIMAGE.convert()
+    Door.LOCKEDDOOR = Door.LOCKEDDOOR.convert()
+    Door.OPENDOOR = Door.OPENDOOR.convert()
+    Door.LOCKEDEXIT = Door.LOCKEDEXIT.convert()
+    Door.OPENEXIT = Door.OPENEXIT.convert()
+    Key.IMKEY = Key.IMKEY.convert()
+    Checkpoint.IMCP = Checkpoint.IMCP.convert()
+    #wind images are stored also in the direction table, ordered by compass direction
+    windnames = ["WINDUP", "WINDUPRI", "WINDRI", "WINDDORI", "WINDDO", "WINDDOLE", "WINDLE", "WINDUPLE"]
+    for wdir, wname in enumerate(windnames):
+        setattr(WindArea, wname, getattr(WindArea, wname).convert())
+        WindArea._windsurfs[wdir] = getattr(WindArea, wname)
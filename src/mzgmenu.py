@@ -100,6 +100,10 @@ class TopLev:
         self.nobutt.connect(src.ENTERINGEVENT, lambda : self.nobutt.switchbgcol(PgButton.HOVERCOL))
         self.nobutt.connect(src.EXITINGEVENT, lambda : self.nobutt.switchbgcol(PgButton.BGCOL))
 
+        #buttons of the map files, rebuilt only if the content of the map directory changes
+        self._gamebuttons = None
+        self._gamedirmtime = None
+
     def show_menupage(self, page):
         """Call the proper function to show a page of the menu"""
         PgWidget.hideall(self.screen, self.BGCOL)
@@ -117,16 +121,26 @@ class TopLev:
         self.ngtitle.show(self.screen)
         self.backtomm.show(self.screen)
 
-        filegames = os.listdir(GAME_DIR)
-        validgames = [f for f in filegames if f.endswith("xml")]
-        if len(validgames) == 0:
-            raise RuntimeError("Error! No game available!")
-
-        for n, fg in enumerate(sorted(validgames)):
-            gamebutt = PgButton(fg, (300, 100 + (n*60)), 50)
-            gamebutt.connect(src.ONCLICKEVENT, lambda dfg=fg : self.selectgame(dfg))
-            gamebutt.connect(src.ENTERINGEVENT, lambda bgc=PgButton.HOVERCOL, wgg=gamebutt : wgg.switchbgcol(bgc))
-            gamebutt.connect(src.EXITINGEVENT, lambda bgc=PgButton.BGCOL, wgg=gamebutt : wgg.switchbgcol(bgc))
+        dirmtime = os.stat(GAME_DIR).st_mtime
+        if self._gamebuttons is None or dirmtime != self._gamedirmtime:
+            filegames = os.listdir(GAME_DIR)
+            validgames = [f for f in filegames if f.endswith("xml")]
+            if len(validgames) == 0:
+                raise RuntimeError("Error! No game available!")
+
+            if self._gamebuttons is not None:
+                for gamebutt in self._gamebuttons:
+                    gamebutt.kill()
+            self._gamebuttons = []
+            for n, fg in enumerate(sorted(validgames)):
+                gamebutt = PgButton(fg, (300, 100 + (n*60)), 50)
+                gamebutt.connect(src.ONCLICKEVENT, lambda dfg=fg : self.selectgame(dfg))
+                gamebutt.connect(src.ENTERINGEVENT, lambda bgc=PgButton.HOVERCOL, wgg=gamebutt : wgg.switchbgcol(bgc))
+                gamebutt.connect(src.EXITINGEVENT, lambda bgc=PgButton.BGCOL, wgg=gamebutt : wgg.switchbgcol(bgc))
+                self._gamebuttons.append(gamebutt)
+            self._gamedirmtime = dirmtime
+
+        for gamebutt in self._gamebuttons:
             gamebutt.show(self.screen)
 
     def menupage_gameover(self):
@@ -149,42 +163,56 @@ class TopLev:
     def menuloop(self, showpage='main'):
         """The main loop for the menu and the game"""
         self.show_menupage(showpage)
+        clock = pygame.time.Clock()
 
         while True:
             self.mlstop = False
+            widgets = PgWidget.widget_list()
+            rects = PgWidget.widget_rects()
+            #the mouse motions of a frame are merged: only where the pointer was and where it is matter
+            motion = None
             for event in pygame.event.get():
                 if event.type == pyloc.QUIT:
                     sys.exit()
                 elif event.type == pyloc.MOUSEBUTTONUP:
-                    for ww in PgWidget.widget_list():
-                        if ww.rect.collidepoint(event.pos):
-                            ww.onclick_event()
-                            break
+                    idx = pygame.Rect(event.pos, (1, 1)).collidelist(rects)
+                    if idx != -1:
+                        #the callback is called directly, without posting the widget event
+                        widgets[idx].trigger(src.ONCLICKEVENT)
+                        #a callback may have switched the menu page
+                        widgets = PgWidget.widget_list()
+                        rects = PgWidget.widget_rects()
                 elif event.type == pyloc.MOUSEMOTION:
-                    prevpos = (event.pos[0] - event.rel[0], event.pos[1] - event.rel[1])
-                    for ww in PgWidget.widget_list():
-                        if ww.rect.collidepoint(event.pos) and not ww.rect.collidepoint(prevpos):
-                            ww.enter_event()
-                            break
-                        elif not ww.rect.collidepoint(event.pos) and ww.rect.collidepoint(prevpos):
-                            ww.exit_event()
-                            break
+                    if motion is None:
+                        prevpos = (event.pos[0] - event.rel[0], event.pos[1] - event.rel[1])
+                    motion = (prevpos, event.pos)
                 elif event.type in [src.ONCLICKEVENT, src.ENTERINGEVENT, src.EXITINGEVENT]:
-                    for ww in PgWidget.widget_list():
-                        if ww._id == event.key_id:
-                            for calls in ww.connectedcalls:
-                                if calls[0] == event.type:
-                                    calls[1]()
-                                    break
-                            else:
-                                continue
-                            break
-
-            for ww in PgWidget.widget_list():
-                ww.wupdate(self.screen)
-            pygame.display.update()
+                    ww = PgWidget.widget_byid(event.key_id)
+                    if ww is not None:
+                        ww.trigger(event.type)
+                    #a callback may have switched the menu page
+                    widgets = PgWidget.widget_list()
+                    rects = PgWidget.widget_rects()
+
+            if motion is not None:
+                inside = pygame.Rect(motion[1], (1, 1)).collidelistall(rects)
+                wasinside = pygame.Rect(motion[0], (1, 1)).collidelistall(rects)
+                #several widgets may change in a merged motion, all of them are notified
+                for idx in sorted(set(inside).symmetric_difference(wasinside)):
+                    if idx in inside:
+                        widgets[idx].trigger(src.ENTERINGEVENT)
+                    else:
+                        widgets[idx].trigger(src.EXITINGEVENT)
+
+            PgWidget.wupdateall(self.screen)
+            #only the redrawn areas are sent to the display, if any
+            if len(PgWidget.dirtyrects) > 0:
+                pygame.display.update(PgWidget.dirtyrects)
+                PgWidget.dirtyrects.clear()
             if self.mlstop:
                 break
+            #no need to poll the events faster than the game frame rate
+            clock.tick(src.FPS)
 
     def gameloop(self):
         mpage = 'main'
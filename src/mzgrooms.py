@@ -55,6 +55,25 @@ class NotValidXML(Exception):
     pass
 
 
+def _sweepandprune(blocks):
+    """Return a list with all the pairs of blocks whose aurect overlap.
+
+    Blocks are sorted by their left edge and swept along the x axis, keeping
+    a list of the blocks whose x interval is still open. Only blocks overlapping
+    on the x axis are checked with colliderect.
+    """
+    pairs = []
+    active = []
+    for bl in sorted(blocks, key=lambda bb: bb.aurect.left):
+        left = bl.aurect.left
+        active = [abl for abl in active if abl.aurect.right > left]
+        for abl in active:
+            if abl.aurect.colliderect(bl.aurect):
+                pairs.append((abl, bl))
+        active.append(bl)
+    return pairs
+
+
 class Room:
     """the block container. Represent a room of the maze.
 
@@ -76,9 +95,9 @@ class Room:
         self.isgame = isgame
         self.roompos = rp
         self.allblocks = sprite.Group()
-        self.walls = sprite.Group()
-        self.ladders = sprite.Group()
-        self.deathblocks = sprite.Group()
+        self.walls = BlockGroup()
+        self.ladders = BlockGroup()
+        self.deathblocks = BlockGroup()
         self.bots = sprite.Group()
         self.doors = sprite.Group()
         self.keys = sprite.Group()
@@ -134,7 +153,7 @@ class Room:
         self.allblocks.add(crblock)
 
         if self.isgame:
-            next(crblock._idcounter)
+            crblock.nextid()
 
         #adjusting screens if needed
         maxx = ((bpos[0] + bsize[0]) // 1000)+1
@@ -168,6 +187,13 @@ class Room:
         if not (0 <= off[0] < self.screens[0] and 0 <= off[1] < self.screens[1]):
             raise RuntimeError
 
+    def overlappingpairs(self, *others):
+        """Return a list of the pairs of overlapping blocks in the room.
+
+        others -- other blocks (e.g. the Character) to be checked together with the room blocks
+        """
+        return _sweepandprune(self.allblocks.sprites() + list(others))
+
     def hoveringsprites(self):
         """Return a list with all the block sprites which can be crossed throught by the player"""
         return self.ladders.sprites() + self.doors.sprites() + self.keys.sprites() + self.windareas.sprites() + self.checkpoints.sprites()
@@ -204,9 +230,8 @@ class Room:
             pass
         else:
             raise ValueError("wrong bgim parameter in Room.draw") 
-        for bb in self.allblocks:
-            if cnt.colliderect(bb.aurect):
-                self.area.image.blit(bb.image, bb.rect)
+        #all the blocks inside the area are drawn in a single batch
+        self.area.image.blits([(bb.image, bb.rect) for bb in self.allblocks if cnt.colliderect(bb.aurect)], False)
         sface.blit(self.area.image, (self.area.aurect.x, self.area.aurect.y))
 
     def empty(self):
@@ -223,7 +248,8 @@ class Maze:
     """
     
     BGCOL = (0, 0, 0)
-    gravity = np.array([0.0, 200.0])
+    #x and y components of the gravity acceleration
+    gravity = (0.0, 200.0)
 
     def __init__(self, fn, loadfile=None, isgame=True):
         """Initialization:
@@ -330,7 +356,7 @@ class Maze:
     def initcursor(self, cpos):
         """Create and initialize the player"""
         self.cursor = Character(cpos, self.firstroom)
-        self.cursor.setforcefield(self.gravity)
+        self.cursor.setforcefield(*self.gravity)
 
     def scrollscreen(self, screen):
         """Draw the next portion of the room on the screen"""
@@ -423,9 +449,9 @@ class Maze:
                 elif event.type == src.CHECKPEVENT:
                     self.savepoint(event.key_id)
                 elif event.type == src.ENTERINGEVENT:
-                    self.cursor.setforcefield(self.gravity + event.wind)
+                    self.cursor.setforcefield(self.gravity[0] + event.wind[0], self.gravity[1] + event.wind[1])
                 elif event.type == src.EXITINGEVENT:
-                    self.cursor.setforcefield(self.gravity)
+                    self.cursor.setforcefield(*self.gravity)
                 elif event.type == src.DEATHEVENT:
                     for rr in self.rooms:
                         rr.empty()
@@ -492,11 +518,10 @@ class Maze:
                     WindArea.cursorinside = None
 
             #checking if character is dying touching a deadly block or a bot
-            for ltt in self.croom.deathblocks.sprites() + self.croom.bots.sprites():
-                if ltt.aurect.colliderect(self.cursor.aurect):
-                    ltt.death_event()
-                    dying = True
-                    break
+            killers = self.cursor.collidinggroup(self.croom.deathblocks) or self.cursor.collidinggroup(self.croom.bots)
+            if killers:
+                killers[0].death_event()
+                dying = True
             if dying:
                 continue
 
@@ -95,11 +95,17 @@ class ScreenArea(sprite.Sprite, src.PosManager):
         ay = (yy / 1000) * (self.aurect.height -2*self._ymargin)
         return src.PosManager.sizetopix(ax, ay)
 
-    def recttopix(self, rr, xoff, yoff):
-        """Converts a pygame.Rect or FlRect instance from arbitrary units to pixel units"""
+    def recttopix(self, rr, xoff, yoff, out=None):
+        """Converts a pygame.Rect or FlRect instance from arbitrary units to pixel units
+
+        If out (a pygame.Rect) is given, it is updated in place and returned instead of creating a new Rect.
+        """
         pos = self.postopix(xoff, yoff, rr.x, rr.y)
         sz = self.sizetopix(rr.width, rr.height)
-        return pygame.Rect(pos[0], pos[1], sz[0], sz[1])
+        if out is None:
+            return pygame.Rect(pos[0], pos[1], sz[0], sz[1])
+        out.update(pos[0], pos[1], sz[0], sz[1])
+        return out
 
     def pixtopos(self, xoff, yoff, *pp):
         """Converts pixel coordinate to absolute position in arbitrary units."""
@@ -46,6 +46,16 @@ import pygame.locals as pyloc
 import src
 
 
+def _displayformat(surf):
+    """Convert a rendered text surface to the display pixel format, keeping its transparency.
+
+    The surface is returned unchanged if the display has not been set yet.
+    """
+    if pygame.display.get_surface() is None:
+        return surf
+    return surf.convert_alpha()
+
+
 class PgWidget(sprite.Sprite, src.PosManager):
     """Base class for all widgets. Do not use this directly, use its children.
 
@@ -60,6 +70,16 @@ class PgWidget(sprite.Sprite, src.PosManager):
     
     _idcounter = count(0)
     allwidgets = sprite.Group()
+    #widgets by id, to dispatch their events
+    _byid = {}
+    #screen areas redrawn since the last display update
+    dirtyrects = []
+    #list of the shown widgets, None when it has to be rebuilt
+    _showncache = None
+    #(list of shown widgets, list of their rects)
+    _rectcache = None
+    #widgets with the update flag set, in flagging order
+    _toupdate = []
     
     def __init__(self, surf, pos):
         """Initialization:
@@ -80,7 +100,8 @@ class PgWidget(sprite.Sprite, src.PosManager):
         self.rect = self.image.get_rect().move(self.pos)
         self._shown = False
         self.allwidgets.add(self)
-        self.connectedcalls = []
+        PgWidget._byid[self._id] = self
+        self.connectedcalls = {}
 
     @staticmethod
     def initcounter():
@@ -89,26 +110,56 @@ class PgWidget(sprite.Sprite, src.PosManager):
 
     @staticmethod
     def widget_list(shownonly=True):
-        """Return a list all widget. If showonly is true, returns the widged displayed on the screen only"""
+        """Return a list all widget. If showonly is true, returns the widged displayed on the screen only
+
+        The list of the shown widgets is cached until a widget is shown or hidden, do not modify it.
+        """
         if shownonly:
-            return [ww for ww in PgWidget.allwidgets.sprites() if ww._shown]
+            if PgWidget._showncache is None:
+                PgWidget._showncache = [ww for ww in PgWidget.allwidgets.sprites() if ww._shown]
+            return PgWidget._showncache
         else:
             return PgWidget.allwidgets.sprites()
 
+    @staticmethod
+    def widget_rects():
+        """Return the rects of the shown widgets, in the same order of widget_list(). Do not modify it."""
+        widgets = PgWidget.widget_list()
+        if PgWidget._rectcache is None or PgWidget._rectcache[0] is not widgets:
+            PgWidget._rectcache = (widgets, [ww.rect for ww in widgets])
+        return PgWidget._rectcache[1]
+
     def show(self, sscr, loadscreen=False):
         """Blit the widget.
         
         loadscreen -- boolean, useful for child classes who override this method
         """
         sscr.blit(self.image, self.pos)
-        self._shown = True
+        if not self._shown:
+            self._shown = True
+            PgWidget._showncache = None
 
     def wupdate(self, sscr):
         """Update the widget"""
         if self.update:
             self.show(sscr, False)
+            self.dirtyrects.append(self.rect)
             self.update = False
 
+    def setupdate(self):
+        """Flag the widget to be redrawn by the next wupdateall"""
+        if not self.update:
+            self.update = True
+            PgWidget._toupdate.append(self)
+
+    @staticmethod
+    def wupdateall(sscr):
+        """Update the flagged widgets which are shown. The hidden ones keep their flag."""
+        for ww in PgWidget._toupdate:
+            if ww._shown:
+                ww.wupdate(sscr)
+        PgWidget._toupdate = [ww for ww in PgWidget._toupdate if ww.update]
+
     @staticmethod
     def hideall(sscr, bgc):
         """Hide a screen, filling it with the bgc color
@@ -117,8 +168,10 @@ class PgWidget(sprite.Sprite, src.PosManager):
         """
         #ssrc must be the screen surface
         sscr.fill(bgc)
+        PgWidget.dirtyrects.append(sscr.get_rect())
         for ww in PgWidget.widget_list():
             ww._shown = False
+        PgWidget._showncache = None
     
     def enter_event(self):
         """Post the enter event to the pygame.event system"""
@@ -135,18 +188,45 @@ class PgWidget(sprite.Sprite, src.PosManager):
         newev = pygame.event.Event(src.ONCLICKEVENT, key_id=self._id)
         pygame.event.post(newev)
 
+    def kill(self):
+        """Remove the widget from all the widget containers"""
+        if PgWidget._byid.get(self._id) is self:
+            del PgWidget._byid[self._id]
+        if self.update:
+            PgWidget._toupdate.remove(self)
+            self.update = False
+        if self._shown:
+            self._shown = False
+            PgWidget._showncache = None
+        super(PgWidget, self).kill()
+
+    @staticmethod
+    def widget_byid(wid):
+        """Return the widget with id wid if it is shown, None otherwise"""
+        ww = PgWidget._byid.get(wid)
+        if ww is not None and ww._shown:
+            return ww
+        return None
+
     def connect(self, eventtype, callback):
-        """Connect a callback to an event type
+        """Connect a callback to an event type, replacing the one previously connected
 
         eventtype -- numeric costant corresponding to an event
         callback -- a callable
         """
-        conn = (eventtype, callback)
-        self.connectedcalls.append(conn)
+        self.connectedcalls[eventtype] = callback
+
+    def trigger(self, eventtype):
+        """Call the callback connected to eventtype, if any, without going through the pygame.event system"""
+        if eventtype in self.connectedcalls:
+            self.connectedcalls[eventtype]()
 
     @staticmethod
     def clear_widgets():
         PgWidget.allwidgets.empty()
+        PgWidget._toupdate = []
+        PgWidget._byid.clear()
+        PgWidget._showncache = None
 
 
 class PgLabel(PgWidget):
@@ -169,7 +249,7 @@ class PgLabel(PgWidget):
         self.text = labtext
         self.font = font
         mfont = pygame.font.Font(self.font, self.sizetopix(0, textheight)[1])
-        surftext = mfont.render(self.text, True, textcolor)
+        surftext = _displayformat(mfont.render(self.text, True, textcolor))
         super(PgLabel, self).__init__(surftext, self.postopix(pos))
 
 
@@ -194,22 +274,29 @@ class PgButton(PgWidget):
         self.text = buttext
         self.font = font
         self.textheight = textheight
-        wgsurf = self.drawbutton(self.BGCOL)
-        super(PgButton, self).__init__(wgsurf, self.postopix(pos))
+        #text and size never change, so the text is rendered and the two states of the button are drawn once
+        mfont = pygame.font.Font(self.font, self.sizetopix(0, self.textheight)[1])
+        self._surftext = _displayformat(mfont.render(self.text, True, self.TEXTCOL))
+        self._surfbg = self.drawbutton(self.BGCOL)
+        self._surfhover = self.drawbutton(self.HOVERCOL)
+        super(PgButton, self).__init__(self._surfbg, self.postopix(pos))
 
     def drawbutton(self, bgc):
         """creates the pygame.Surface instance with the text of the button"""
-        mfont = pygame.font.Font(self.font, self.sizetopix(0, self.textheight)[1])
-        surftext = mfont.render(self.text, True, self.TEXTCOL)
-        surfbutton = pygame.Surface([surftext.get_width(), surftext.get_height()])
+        surfbutton = pygame.Surface(self._surftext.get_size())
         surfbutton.fill(bgc)
-        surfbutton.blit(surftext, (0, 0))
+        surfbutton.blit(self._surftext, (0, 0))
         return surfbutton
 
     def switchbgcol(self, bgc):
         """switch toe color of the background of the surface (for highlight when the mouse enters)"""
-        self.image = self.drawbutton(bgc)
-        self.update = True
+        if bgc == self.HOVERCOL:
+            self.image = self._surfhover
+        elif bgc == self.BGCOL:
+            self.image = self._surfbg
+        else:
+            self.image = self.drawbutton(bgc)
+        self.setupdate()
 
     def show(self, ssrc, loadscreen=True):
         """override base method, draw the widget"""
@@ -252,4 +339,4 @@ class PgTextArea(PgWidget):
         else:
             self.text = txt
         mfont = pygame.font.Font(self.font, self.sizetopix(0, self.textheight)[1])
-        self.image = mfont.render(self.text, True, self.textcolor)
+        self.image = _displayformat(mfont.render(self.text, True, self.textcolor))
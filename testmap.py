@@ -46,9 +46,11 @@ from pygame.locals import *
 
 import src
 from src.mzgrooms import *
+from src.mzgwidgets import PgWidget
 
 #if pygame display is not initialized, images cannot be converted and Block building fails.
 pygame.display.set_mode(src.PosManager.screen_size())
+src.mzgblocks.init_assets()
 
 
 class TestMaze(unittest.TestCase):
@@ -84,13 +86,13 @@ class TestMaze(unittest.TestCase):
     def test_blocksoverlapping(self):
         """Test if there are overlappig blocks."""
         for rr in self.game.rooms:
-            albl = rr.allblocks.sprites()
             if self.game.firstroom == rr.roompos:
-                albl.append(self.game.cursor)
-            for i, bl in enumerate(albl[:-1]):
-                for obl in albl[i+1:]:
-                    txtmess = f"overlap!\n{etree_tostring(bl.reprxml())}\n{etree_tostring(obl.reprxml())}"
-                    self.assertFalse(bl.aurect.colliderect(obl.aurect), txtmess)
+                overlaps = rr.overlappingpairs(self.game.cursor)
+            else:
+                overlaps = rr.overlappingpairs()
+            for bl, obl in overlaps:
+                txtmess = f"overlap!\n{etree_tostring(bl.reprxml())}\n{etree_tostring(obl.reprxml())}"
+                self.fail(txtmess)
     
     def test_doors(self):
         """Test if doors are working correctly:
@@ -143,6 +145,25 @@ class TestMaze(unittest.TestCase):
             self.assertFalse(len(key.whoopen) > 2, cmessd)
 
 
+class TestWidgets(unittest.TestCase):
+    """Checks on the widget containers used by the menu
+
+    Child of unittest.TestCase. Independent from the tested map.
+    """
+
+    def test_killshown(self):
+        """Test that a killed widget is no more listed nor hit-tested, even if it was shown"""
+        screen = pygame.display.get_surface()
+        wdg = PgWidget(pygame.Surface((10, 10)), (0, 0))
+        wdg.show(screen)
+        self.assertIn(wdg, PgWidget.widget_list())
+        self.assertIn(wdg.rect, PgWidget.widget_rects())
+        wdg.kill()
+        self.assertNotIn(wdg, PgWidget.widget_list())
+        self.assertFalse(any(rr is wdg.rect for rr in PgWidget.widget_rects()))
+        self.assertIsNone(PgWidget.widget_byid(wdg._id))
+
+
 if __name__ == '__main__':
     MDIR = os.path.dirname(os.path.abspath(os.path.realpath(__file__)))
     docpath = os.path.join(MDIR, "gamemaps")